@@ -20,11 +20,15 @@ Regras principais (resumo):
 - Removidos: downloads de CSV e "Termos recorrentes".
 """
 from __future__ import annotations
+import csv
+import hashlib
+import io
 import re
 from collections import Counter
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from typing import Tuple, List
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
@@ -79,108 +83,208 @@ STATUS_ENCERRADOS = {
 PALAVRAS_REQUEST = {"request", "solicita", "requisição", "requisicao", "service request"}
 PALAVRAS_INCIDENT = {"incident", "incidente"}
 
+# Colunas de baixa cardinalidade armazenadas como category (groupby/isin sobre códigos inteiros)
+COLUNAS_CATEGORICAS = ("Responsavel", "Status", "Tipo", "Projeto", "Aplicacao")
+
 # =========================================
 # Utilidades de Data/Hora — suporte PT/EN (meses)
 # =========================================
 _PT_TO_EN_MONTHS = {
     # abreviações
-    r"\bjan\b": "Jan", r"\bfev\b": "Feb", r"\bmar\b": "Mar", r"\babr\b": "Apr",
-    r"\bmai\b": "May", r"\bjun\b": "Jun", r"\bjul\b": "Jul", r"\bago\b": "Aug",
-    r"\bset\b": "Sep", r"\bout\b": "Oct", r"\bnov\b": "Nov", r"\bdez\b": "Dec",
+    "jan": "Jan", "fev": "Feb", "mar": "Mar", "abr": "Apr",
+    "mai": "May", "jun": "Jun", "jul": "Jul", "ago": "Aug",
+    "set": "Sep", "out": "Oct", "nov": "Nov", "dez": "Dec",
     # nomes completos
-    r"\bjaneiro\b": "January", r"\bfevereiro\b": "February", r"\bmarço\b": "March",
-    r"\bmarco\b": "March", r"\babril\b": "April", r"\bmaio\b": "May",
-    r"\bjunho\b": "June", r"\bjulho\b": "July", r"\bagosto\b": "August",
-    r"\bsetembro\b": "September", r"\boutubro\b": "October", r"\bnovembro\b": "November",
-    r"\bdezembro\b": "December",
+    "janeiro": "January", "fevereiro": "February", "março": "March",
+    "marco": "March", "abril": "April", "maio": "May",
+    "junho": "June", "julho": "July", "agosto": "August",
+    "setembro": "September", "outubro": "October", "novembro": "November",
+    "dezembro": "December",
 }
+# Uma única regex com todos os meses (mais longos primeiro) => 1 passada por célula
+_PT_MONTH_RE = re.compile(
+    r"\b(" + "|".join(sorted(_PT_TO_EN_MONTHS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
+# Datas ISO (Sheets, API REST): dayfirst=True trocaria dia e mês em "2025-01-02" no pandas 3
+_ISO_RE = re.compile(r"^\s*\d{4}-\d{2}-\d{2}")
+
+def _pt_month_to_en(m: re.Match) -> str:
+    return _PT_TO_EN_MONTHS[m.group(1).lower()]
+
+# Formatos tentados manualmente, na ordem mais comum em exports do Jira
+_DATETIME_FORMATS = [
+    "%d/%b/%y %I:%M %p", "%d/%b/%Y %I:%M %p",  # 05/May/25 4:30 PM
+    "%d/%b/%y %H:%M", "%d/%b/%Y %H:%M",        # 05/May/25 16:30
+    "%d/%m/%Y %H:%M", "%d/%m/%y %H:%M",        # 05/05/2025 16:30
+    "%d/%m/%Y", "%d/%m/%y",                    # 05/05/2025
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M",     # 2025-05-05 16:30:00
+    "%Y-%m-%d",
+]
+
+# Offset no fim do texto: Z, -03:00 ou -0300
+_OFFSET_RE = re.compile(r"(Z|[+-]\d{2}:?\d{2})\s*$")
 
-def _replace_pt_months_to_en(text: str) -> str:
-    """Substitui meses PT por EN de forma case-insensitive."""
-    if not isinstance(text, str):
-        return text
-    s = text
-    for pattern, repl in _PT_TO_EN_MONTHS.items():
-        s = re.sub(pattern, repl, s, flags=re.IGNORECASE)
-    return s
+def _fuso_predominante(offsets: pd.Series) -> timezone:
+    """Offset mais frequente (textos de _OFFSET_RE) como timezone fixo."""
+    o = offsets.value_counts().idxmax()
+    if o == "Z":
+        return timezone.utc
+    sinal = -1 if o[0] == "-" else 1
+    return timezone(sinal * timedelta(hours=int(o[1:3]), minutes=int(o[-2:])))
+
+def _to_datetime_sem_fuso(valores: pd.Series, **kwargs) -> pd.Series:
+    """
+    pd.to_datetime(errors="coerce") sempre tz-naive (filtros comparam com Timestamps sem fuso).
+    Um único offset (ex.: '2025-05-05T10:00:00-03:00') mantém a hora local do arquivo;
+    offsets misturados (ex.: export que atravessa o horário de verão) vão para o offset
+    mais frequente do arquivo, e valores sem offset mantêm a hora como está.
+    """
+    try:
+        out = pd.to_datetime(valores, errors="coerce", cache=True, **kwargs)
+    except ValueError:
+        out = None  # pandas 3: offsets misturados levantam erro mesmo com errors="coerce"
+    if out is None or not pd.api.types.is_datetime64_any_dtype(out):
+        offsets = valores.astype(str).str.extract(_OFFSET_RE, expand=False)
+        com_fuso = offsets.notna()
+        fuso = _fuso_predominante(offsets[com_fuso]) if com_fuso.any() else timezone.utc
+        out = pd.to_datetime(valores, errors="coerce", cache=True, utc=True, **kwargs).dt.tz_convert(fuso)
+        out = out.dt.tz_localize(None)
+        if com_fuso.any() and not com_fuso.all():
+            out[~com_fuso] = pd.to_datetime(valores[~com_fuso], errors="coerce", cache=True, **kwargs)
+    elif out.dt.tz is not None:
+        out = out.dt.tz_localize(None)
+    return out
 
 def parse_mixed_datetime_series(s: pd.Series) -> pd.Series:
     """
     Converte série de datas que pode vir em PT ou EN.
     Aceita formatos como '05/mai/25 4:30 PM' ou '05/May/25 4:30 PM'.
+    Cada etapa só reprocessa os valores preenchidos que a anterior não converteu.
     """
     if s is None or len(s) == 0:
         return pd.to_datetime(pd.Series([], dtype="object"))
 
-    # 1) tenta direto
-    out = pd.to_datetime(s, errors="coerce", dayfirst=True, infer_datetime_format=True)
-    if out.notna().any() and out.isna().sum() <= (len(out) * 0.2):
+    # 1) tenta direto — ISO com format="ISO8601"; o resto com format="mixed", que interpreta
+    #    valor a valor (cache=True reaproveita repetidos); valores com mês em PT vão direto
+    #    para a etapa 2 (no "mixed" falhariam um a um)
+    texto = s.astype(str)
+    preenchidos = s.notna().to_numpy()
+    iso = preenchidos & texto.str.contains(_ISO_RE, na=False).to_numpy()
+    tem_mes_pt = texto.str.contains(_PT_MONTH_RE, na=False).to_numpy()
+    out = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    if iso.any():
+        out[iso] = _to_datetime_sem_fuso(s[iso], format="ISO8601").to_numpy()
+    diretos = preenchidos & ~iso & ~tem_mes_pt
+    if diretos.any():
+        out[diretos] = _to_datetime_sem_fuso(s[diretos], format="mixed", dayfirst=True).to_numpy()
+    pendentes = out.isna() & s.notna()
+    if not pendentes.any():
         return out
 
-    # 2) substitui meses PT->EN e tenta novamente
-    s2 = s.astype(str).map(_replace_pt_months_to_en)
-    out2 = pd.to_datetime(s2, errors="coerce", dayfirst=True, infer_datetime_format=True)
-    if out2.notna().any():
-        return out2
-
-    # 3) tenta alguns formatos comuns manualmente
-    tried = []
-    for fmt in [
-        "%d/%b/%y %I:%M %p", "%d/%b/%Y %I:%M %p",  # 05/May/25 4:30 PM
-        "%d/%b/%y %H:%M", "%d/%b/%Y %H:%M",        # 05/May/25 16:30
-        "%d/%m/%Y %H:%M", "%d/%m/%y %H:%M",        # 05/05/2025 16:30
-        "%d/%m/%Y", "%d/%m/%y",                    # 05/05/2025
-        "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M",     # 2025-05-05 16:30:00
-        "%Y-%m-%d",
-    ]:
-        try:
-            parsed = pd.to_datetime(s2, format=fmt, errors="coerce")
-            if parsed.notna().any():
-                return parsed
-        except Exception as e:
-            tried.append((fmt, str(e)))
+    # 2) substitui meses PT->EN (uma regex para todos os meses) e tenta os formatos comuns
+    #    (formato explícito é bem mais rápido que "mixed", que interpreta valor a valor)
+    s2 = s[pendentes].astype(str).str.replace(_PT_MONTH_RE, _pt_month_to_en, regex=True)
+    for fmt in _DATETIME_FORMATS:
+        restantes = s2[out[pendentes].isna().to_numpy()]
+        if restantes.empty:
+            return out
+        out.loc[restantes.index] = _to_datetime_sem_fuso(restantes, format=fmt).to_numpy()
 
-    # 4) fallback final — devolve tudo como NaT
-    return pd.to_datetime(s2, errors="coerce", dayfirst=True)
+    # 3) o que ainda restar: format="mixed" nos textos já traduzidos (restantes ficam NaT)
+    restantes = s2[out[pendentes].isna().to_numpy()]
+    if not restantes.empty:
+        out.loc[restantes.index] = _to_datetime_sem_fuso(restantes, format="mixed", dayfirst=True).to_numpy()
+    return out
 
 # =========================================
 # Utils – leitura robusta de CSV
 # =========================================
+_SEPARADORES = ";,\t|"
+_TAMANHO_AMOSTRA = 64 * 1024
+# utf-8-sig também lê UTF-8 sem BOM; cp1252 antes de latin1 (exports do Excel/Windows)
+_ENCODINGS = ["utf-8-sig", "cp1252", "latin1"]
+# Só as colunas que o COLMAP reconhece são carregadas (exports do Jira trazem centenas)
+_COLUNAS_CONHECIDAS = {col for candidatos in COLMAP.values() for col in candidatos}
+_LINHAS_POR_BLOCO = 200_000
+
+def _detectar_encoding(amostra: bytes) -> str:
+    """Primeiro encoding de _ENCODINGS que decodifica a amostra sem erros."""
+    for enc in _ENCODINGS:
+        try:
+            amostra.decode(enc)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return "latin1"
+
+def _detectar_separador(texto: str) -> str:
+    """csv.Sniffer entre ; , \\t e |; se falhar, o separador mais frequente no cabeçalho."""
+    try:
+        return csv.Sniffer().sniff(texto, delimiters=_SEPARADORES).delimiter
+    except csv.Error:
+        cabecalho = texto.splitlines()[0] if texto else ""
+        return max(_SEPARADORES, key=cabecalho.count)
+
+def _colunas_usadas(texto: str, sep: str) -> List[str] | None:
+    """Colunas do cabeçalho presentes no COLMAP (None = todas, se nenhuma for reconhecida)."""
+    cabecalho = next(csv.reader(io.StringIO(texto), delimiter=sep), [])
+    usadas = [c for c in cabecalho if c in _COLUNAS_CONHECIDAS]
+    return usadas or None
+
+def _read_csv(arquivo, **kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv; com chunksize (só nos fallbacks engine='c'), concatena os blocos.
+    O concat mantém todos os blocos até copiá-los para o resultado (pico ~ 2x o DataFrame);
+    quem reduz a memória é o usecols, não os blocos.
+    """
+    if "chunksize" not in kwargs:
+        return pd.read_csv(arquivo, **kwargs)
+    with pd.read_csv(arquivo, **kwargs) as blocos:
+        return pd.concat(blocos, ignore_index=True)
+
 def ler_csv_flex(arquivo) -> pd.DataFrame:
     """
     Leitura robusta:
-    1) Detecta automaticamente separador (engine='python')
-    2) Tenta ; , \t e |
-    3) Varre encodings comuns
-    4) Última tentativa: on_bad_lines='skip' para ignorar linhas ruins
+    1) Lê uma amostra (64 KB) e detecta encoding, separador (; , \t e |) e colunas do COLMAP
+    2) Uma única leitura completa com engine='pyarrow' (multithread); tudo como texto,
+       datas ficam para parse_mixed_datetime_series
+    3) Se falhar, engine='c' em blocos de 200 mil linhas e depois on_bad_lines='skip'
+    4) Bytes inválidos depois da amostra: repete 2-3 com os demais _ENCODINGS
+    5) Última tentativa: engine='python' ignorando erros de encoding
     """
-    tentativas = []
-    # detecção automática
-    tentativas.append(dict(sep=None, engine="python"))
-    # separadores comuns
-    for sep in [";", ",", "\t", "|"]:
-        tentativas.append(dict(sep=sep, engine="python"))
-    # ignorando linhas problemáticas
-    for sep in [";", ",", "\t", "|", None]:
-        tentativas.append(dict(sep=sep, engine="python", on_bad_lines="skip"))
-
-    encodings = [None, "utf-8", "latin1", "cp1252"]
-
     pos = arquivo.tell()
-    for enc in encodings:
+    amostra = arquivo.read(_TAMANHO_AMOSTRA)
+    arquivo.seek(pos)
+    # corta na última quebra de linha (sem linha nem caractere multibyte pela metade)
+    if len(amostra) == _TAMANHO_AMOSTRA and b"\n" in amostra:
+        amostra = amostra[:amostra.rfind(b"\n") + 1]
+
+    enc = _detectar_encoding(amostra)
+    texto = amostra.decode(enc, errors="replace")
+    sep = _detectar_separador(texto)
+    usecols = _colunas_usadas(texto, sep)
+
+    blocos = dict(engine="c", dtype="string[pyarrow]", chunksize=_LINHAS_POR_BLOCO)
+    tentativas = [
+        dict(engine="pyarrow", dtype="string[pyarrow]"),
+        blocos,
+        dict(blocos, on_bad_lines="skip"),
+    ]
+    for enc_leitura in [enc] + [e for e in _ENCODINGS if e != enc]:
         for kwargs in tentativas:
             try:
                 arquivo.seek(pos)
-                if enc:
-                    df = pd.read_csv(arquivo, encoding=enc, **kwargs)
-                else:
-                    df = pd.read_csv(arquivo, **kwargs)
+                df = _read_csv(arquivo, sep=sep, encoding=enc_leitura, usecols=usecols, **kwargs)
                 if df.shape[1] > 0:
                     return df
+            except UnicodeDecodeError:
+                break  # a amostra não representava o arquivo todo: próximo encoding
             except Exception:
                 continue
     arquivo.seek(pos)
-    return pd.read_csv(arquivo, sep=",", engine="python", on_bad_lines="skip", encoding_errors="ignore")
+    return pd.read_csv(arquivo, sep=sep, encoding=enc, usecols=usecols, engine="python", on_bad_lines="skip", encoding_errors="ignore")
 
 # =========================================
 # Normalização de colunas e validações
@@ -202,27 +306,61 @@ def validar_minimo(df: pd.DataFrame, necessarias: List[str]) -> Tuple[bool, List
 # =========================================
 # Classificação de tipo (Request/Incident/Outro)
 # =========================================
-def normalizar_tipo_linha(row) -> str:
+_INCIDENT_RE = re.compile("|".join(map(re.escape, sorted(PALAVRAS_INCIDENT))))
+_REQUEST_RE = re.compile("|".join(map(re.escape, sorted(PALAVRAS_REQUEST))))
+
+def _coluna_texto(df: pd.DataFrame, col: str) -> pd.Series:
+    """Coluna como texto (nulos/ausente => string vazia)."""
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype="object")
+    return df[col].astype("object").where(df[col].notna(), "").astype(str)
+
+def texto_tipo_projeto(df: pd.DataFrame) -> pd.Series:
+    """' tipo projeto' em minúsculas, como category (poucos valores distintos)."""
+    return (" " + _coluna_texto(df, "Tipo") + " " + _coluna_texto(df, "Projeto")).str.lower().astype("category")
+
+def _normalizar_tipo_vetorizado(df: pd.DataFrame) -> np.ndarray:
+    """Classificação vetorizada (texto de Tipo+Projeto montado uma vez, em texto_tipo_projeto)."""
+    # Prioridade 2: Tipo e Projeto (.str em category avalia só os valores distintos)
+    texto = texto_tipo_projeto(df)
+    tipo = np.select(
+        [texto.str.contains(_INCIDENT_RE, na=False), texto.str.contains(_REQUEST_RE, na=False)],
+        ["Incident", "Request"],
+        default="Outro",
+    )
+    # Prioridade 1: Chave
+    if "Chave" in df.columns:
+        chave3 = _coluna_texto(df, "Chave").str.upper().str[:3].to_numpy()
+        tipo = np.where(chave3 == "REQ", "Request", np.where(chave3 == "INC", "Incident", tipo))
+    return tipo
+
+def _classificar_tipo(chave, tipo, projeto) -> str:
+    """Mesma regra para uma linha (usada só no fallback)."""
     # Prioridade 1: Chave
-    if "Chave" in row and pd.notna(row["Chave"]):
-        chave3 = str(row["Chave"]).upper()[:3]
+    if pd.notna(chave):
+        chave3 = str(chave).upper()[:3]
         if chave3 == "REQ":
             return "Request"
         if chave3 == "INC":
             return "Incident"
     # Prioridade 2: Tipo e Projeto
-    texto = ""
-    if "Tipo" in row and pd.notna(row["Tipo"]):
-        texto += f" {str(row['Tipo'])}"
-    if "Projeto" in row and pd.notna(row["Projeto"]):
-        texto += f" {str(row['Projeto'])}"
-    t = texto.lower()
-    if any(p in t for p in PALAVRAS_INCIDENT):
+    t = "".join(f" {v}" for v in (tipo, projeto) if pd.notna(v)).lower()
+    if _INCIDENT_RE.search(t):
         return "Incident"
-    if any(p in t for p in PALAVRAS_REQUEST):
+    if _REQUEST_RE.search(t):
         return "Request"
     return "Outro"
 
+def normalizar_tipo(df: pd.DataFrame) -> pd.Series:
+    """Classifica cada linha em Request/Incident/Outro (vetorizado; itertuples se falhar)."""
+    try:
+        tipo = _normalizar_tipo_vetorizado(df)
+    except (TypeError, ValueError, AttributeError):
+        # dtypes inesperados: itertuples não monta uma Series por linha como apply(axis=1)
+        linhas = df.reindex(columns=["Chave", "Tipo", "Projeto"]).itertuples(index=False, name=None)
+        tipo = [_classificar_tipo(*linha) for linha in linhas]
+    return pd.Series(tipo, index=df.index, dtype="object")
+
 # =========================================
 # Filtros por período (Union de Criado OU Resolvido)
 # =========================================
@@ -246,27 +384,78 @@ def period_bounds(modo: str, ano: int, mes: int, intervalo: Tuple[date, date]) -
     # Intervalo
     return intervalo[0], intervalo[1]
 
-def aplicar_periodo_union(df: pd.DataFrame, ini: date, fim: date) -> pd.DataFrame:
-    """Aplica filtro de período considerando Criado OU Resolvido no intervalo."""
-    criado = pd.to_datetime(df["Criado"], errors="coerce")
+def limites_datas(df: pd.DataFrame) -> Tuple[date, date]:
+    """(menor, maior) data entre Criado e Resolvido, via min/max direto no datetime64."""
+    extremos = [
+        v for c in ("Criado", "Resolvido") if c in df.columns
+        for v in (df[c].min(), df[c].max()) if pd.notna(v)
+    ]
+    if not extremos:
+        return date(1970, 1, 1), date(2100, 12, 31)
+    return min(extremos).date(), max(extremos).date()
+
+def mascara_periodo(serie: pd.Series, ini: date, fim: date) -> pd.Series:
+    """Máscara ini <= serie <= fim (dias inclusivos), comparando datetime64 direto (NaT => False)."""
+    ini_ts = pd.Timestamp(ini)
+    fim_ts = pd.Timestamp(fim) + pd.Timedelta(days=1)
+    return (serie >= ini_ts) & (serie < fim_ts)
+
+def mascara_status(status: pd.Series, valores) -> np.ndarray:
+    """status.astype(str).isin(valores); em category compara só os códigos inteiros."""
+    if isinstance(status.dtype, pd.CategoricalDtype):
+        codigos = np.flatnonzero(status.cat.categories.astype(str).isin(list(valores)))
+        return np.isin(status.cat.codes.to_numpy(), codigos)
+    return status.astype(str).isin(list(valores)).to_numpy()
+
+def mascara_periodo_union(df: pd.DataFrame, ini: date, fim: date) -> pd.Series:
+    """Filtro de período considerando Criado OU Resolvido no intervalo."""
+    # Datas já convertidas em load_and_prepare (parse_mixed_datetime_series)
+    assert pd.api.types.is_datetime64_any_dtype(df["Criado"])
+    criado = df["Criado"]
     if "Resolvido" in df.columns:
-        resolvido = pd.to_datetime(df["Resolvido"], errors="coerce")
+        resolvido = df["Resolvido"]
     else:
-        resolvido = pd.Series([pd.NaT] * len(df))
+        resolvido = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
 
-    mask = (
-        ((criado.dt.date >= ini) & (criado.dt.date <= fim)) |
-        ((resolvido.dt.date >= ini) & (resolvido.dt.date <= fim))
-    )
-    return df[mask].copy()
+    return mascara_periodo(criado, ini, fim) | mascara_periodo(resolvido, ini, fim)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def mascara_filtros(
+    _df: pd.DataFrame,
+    id_arquivo: str,
+    ini: date,
+    fim: date,
+    analista: str,
+    status: Tuple[str, ...]
+) -> np.ndarray:
+    """
+    Máscara final dos filtros: UNION do período + analista + status (vazio = todos).
+    Cacheada por (id_arquivo, filtros); _df não entra no hash do cache.
+    """
+    mask = mascara_periodo_union(_df, ini, fim).to_numpy()
+    if analista != "Todos":
+        mask = mask & (_df["Responsavel"] == analista).to_numpy()
+    if status:
+        mask = mask & mascara_status(_df["Status"], status)
+    return mask
 
 # =========================================
 # Métricas por analista considerando período
 # =========================================
+_UM_DIA = np.timedelta64(1, "D")
+
+def duracao_dias(criado: pd.Series, resolvido: pd.Series) -> np.ndarray:
+    """(Resolvido - Criado) em dias, direto nos arrays datetime64 (NaT => NaN)."""
+    return (resolvido.to_numpy(dtype="datetime64[ns]") - criado.to_numpy(dtype="datetime64[ns]")) / _UM_DIA
+
+@st.cache_data(show_spinner=False, max_entries=32)
 def resumo_por_analista_periodico(
-    df_base: pd.DataFrame,
+    _df_base: pd.DataFrame,
+    id_arquivo: str,
     ini: date,
     fim: date,
+    analista: str,
+    status: Tuple[str, ...],
     status_encerrados: set[str] = STATUS_ENCERRADOS
 ) -> pd.DataFrame:
     """
@@ -276,54 +465,49 @@ def resumo_por_analista_periodico(
       - Tickets em Aberto = criados no período que NÃO estavam resolvidos até o fim do período
       - Tempo médio p/ Encerramento (dias) = média (Resolvido - Criado) somente de tickets resolvidos no período
       - Média de Tickets Encerrados por Dia = (Encerrados no período) / (nº de dias ÚTEIS do período)
+    _df_base é o recorte de mascara_filtros; o cache usa a mesma chave (id_arquivo, filtros),
+    sem hashear o DataFrame.
     """
-    if df_base.empty:
+    if _df_base.empty:
         return pd.DataFrame(columns=[
             "Responsável", "Total de Tickets", "Tickets Encerrados",
             "Tickets em Aberto", "Tempo médio para Encerramento (dias)",
             "Média de Tickets Encerrados por Dia"
         ])
 
-    # Garantir datas
-    df = df_base.copy()
-    df["Criado"] = pd.to_datetime(df["Criado"], errors="coerce")
-    if "Resolvido" in df.columns:
-        df["Resolvido"] = pd.to_datetime(df["Resolvido"], errors="coerce")
-    else:
-        df["Resolvido"] = pd.NaT
-
-    # Subconjuntos do período
-    criados_mask = (df["Criado"].dt.date >= ini) & (df["Criado"].dt.date <= fim)
-    enc_mask = df["Resolvido"].notna() & (df["Resolvido"].dt.date >= ini) & (df["Resolvido"].dt.date <= fim) & (df["Status"].isin(status_encerrados))
-
-    df_criados = df[criados_mask]
-    df_enc = df[enc_mask]
-
-    # Total criados por responsável
-    total = df_criados.groupby("Responsavel").size().rename("Total de Tickets")
-
-    # Encerrados por responsável (no período)
-    encerrados = df_enc.groupby("Responsavel").size().rename("Tickets Encerrados")
+    # Datas já convertidas em load_and_prepare (parse_mixed_datetime_series)
+    assert pd.api.types.is_datetime64_any_dtype(_df_base["Criado"])
+    # Projeção: só as colunas usadas nas métricas (os subconjuntos abaixo não copiam Resumo/Descrição)
+    df = _df_base[[c for c in ["Responsavel", "Status", "Criado", "Resolvido"] if c in _df_base.columns]]
+    if "Resolvido" not in df.columns:
+        df = df.assign(Resolvido=pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]"))
 
+    # Máscaras do período
+    criados_mask = mascara_periodo(df["Criado"], ini, fim)
+    enc_mask = mascara_periodo(df["Resolvido"], ini, fim) & mascara_status(df["Status"], status_encerrados)
     # Abertos no período = criados no período que NÃO estavam resolvidos até o fim do período
-    ainda_abertos_mask = criados_mask & (df["Resolvido"].isna() | (df["Resolvido"].dt.date > fim))
-    df_abertos = df[ainda_abertos_mask]
-    abertos = df_abertos.groupby("Responsavel").size().rename("Tickets em Aberto")
-
-    # Tempo médio de encerramento (dias) — somente resolvidos no período
-    if not df_enc.empty:
-        aux = df_enc.dropna(subset=["Criado", "Resolvido"]).copy()
-        aux["dur_dias"] = (aux["Resolvido"] - aux["Criado"]).dt.total_seconds() / (3600 * 24)
-        tempo_medio = aux.groupby("Responsavel")["dur_dias"].mean().rename("Tempo médio para Encerramento (dias)")
-    else:
-        tempo_medio = pd.Series(dtype=float, name="Tempo médio para Encerramento (dias)")
-
-    # Junta
-    base = pd.concat([total, encerrados, abertos, tempo_medio], axis=1).fillna(0)
+    ainda_abertos_mask = criados_mask & (df["Resolvido"].isna() | (df["Resolvido"] >= pd.Timestamp(fim) + pd.Timedelta(days=1)))
+    # Duração (dias) — somente resolvidos no período
+    dur_dias = duracao_dias(df["Criado"], df["Resolvido"])
+
+    # Um único groupby com indicadores (em vez de um groupby por métrica + concat)
+    indicadores = pd.DataFrame({
+        "Responsavel": df["Responsavel"],
+        "_criado": criados_mask.astype("int8"),
+        "_enc": enc_mask.astype("int8"),
+        "_aberto": ainda_abertos_mask.astype("int8"),
+        "_dur": np.where(enc_mask, dur_dias, np.nan),
+    })[criados_mask | enc_mask]
+    base = indicadores.groupby("Responsavel", observed=True, sort=False).agg(**{
+        "Total de Tickets": ("_criado", "sum"),
+        "Tickets Encerrados": ("_enc", "sum"),
+        "Tickets em Aberto": ("_aberto", "sum"),
+        "Tempo médio para Encerramento (dias)": ("_dur", "mean"),
+    })
+    base["Tempo médio para Encerramento (dias)"] = base["Tempo médio para Encerramento (dias)"].fillna(0)
 
     # Dias ÚTEIS no período (segunda=0 .. sexta=4). Inclui dias sem encerramento (contados como 0)
-    dias_uteis = pd.date_range(start=ini, end=fim, freq="B")
-    n_dias_uteis = max(len(dias_uteis), 1)
+    n_dias_uteis = max(int(np.busday_count(np.datetime64(ini, "D"), np.datetime64(fim, "D") + np.timedelta64(1, "D"))), 1)
 
     # Média de encerrados por dia útil
     base["Média de Tickets Encerrados por Dia"] = base.get("Tickets Encerrados", 0) / n_dias_uteis
@@ -342,11 +526,55 @@ def resumo_por_analista_periodico(
 def tempo_medio_encerramento_dias(df: pd.DataFrame) -> float:
     if df.empty or "Resolvido" not in df.columns:
         return 0.0
-    base = df.dropna(subset=["Criado", "Resolvido"]).copy()
-    if base.empty:
+    dur_dias = duracao_dias(df["Criado"], df["Resolvido"])
+    if np.isnan(dur_dias).all():
         return 0.0
-    base["dur_dias"] = (base["Resolvido"] - base["Criado"]).dt.total_seconds() / (3600 * 24)
-    return float(base["dur_dias"].mean())
+    return float(np.nanmean(dur_dias))
+
+# =========================================
+# Ordenação da tabela detalhada
+# =========================================
+def ordem_desc(datas: pd.Series) -> np.ndarray:
+    """Posições que ordenam as datas do mais recente ao mais antigo.
+
+    Empates mantêm a ordem do arquivo e NaT vai para o fim, como sort_values(ascending=False).
+    """
+    valores = datas.to_numpy(dtype="datetime64[ns]")
+    nat = np.isnat(valores)
+    validas = np.flatnonzero(~nat)
+    # nega os inteiros (só das datas válidas: NaT é o menor int64 e estouraria) e ordena estável
+    ordem = validas[np.argsort(-valores[validas].view("i8"), kind="stable")]
+    return np.concatenate([ordem, np.flatnonzero(nat)])
+
+# =========================================
+# Carga + normalização (cacheada por conteúdo do arquivo)
+# =========================================
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_and_prepare(file_bytes: bytes) -> pd.DataFrame:
+    """
+    Lê o CSV, padroniza colunas, converte datas (PT/EN) e classifica o tipo.
+    Cacheado pelos bytes do upload: interações com filtros não reprocessam o arquivo.
+    """
+    df = padronizar_colunas(ler_csv_flex(io.BytesIO(file_bytes)))
+
+    # Tratamento de datas (PT/EN)
+    if "Criado" in df.columns:
+        df["Criado"] = parse_mixed_datetime_series(df["Criado"])
+    if "Resolvido" in df.columns:
+        df["Resolvido"] = parse_mixed_datetime_series(df["Resolvido"])
+
+    # Tipo normalizado (Request/Incident/Outro) — calculado uma vez por arquivo
+    df["Tipo_Normalizado"] = normalizar_tipo(df)
+
+    for c in COLUNAS_CATEGORICAS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+
+    # Limites do dataset para "Todo período" (uma vez por arquivo, não a cada rerun)
+    df.attrs["limites_datas"] = limites_datas(df)
+    # Identidade do arquivo para as chaves de cache dos filtros
+    df.attrs["id_arquivo"] = hashlib.md5(file_bytes).hexdigest()
+    return df
 
 # =========================================
 # Upload
@@ -356,32 +584,13 @@ if not uploaded:
     st.info("➡️ Anexe o CSV para iniciar a análise.")
     st.stop()
 
-df_raw = ler_csv_flex(uploaded)
-df = padronizar_colunas(df_raw)
+df = load_and_prepare(uploaded.getvalue())
 
 ok, faltando = validar_minimo(df, ["Responsavel", "Status", "Criado"])
 if not ok:
     st.error(f"Colunas obrigatórias ausentes: {', '.join(faltando)}. Verifique COLMAP.")
     st.stop()
 
-df["Criado"] = parse_mixed_datetime_series(df["Criado"])
-if "Resolvido" in df.columns:
-    df["Resolvido"] = parse_mixed_datetime_series(df["Resolvido"])
-
-df["Tipo_Normalizado"] = df.apply(normalizar_tipo_linha, axis=1)
-
-# =========================================
-# Tratamento de datas (PT/EN)
-# =========================================
-df["Criado"] = parse_mixed_datetime_series(df["Criado"])
-if "Resolvido" in df.columns:
-    df["Resolvido"] = parse_mixed_datetime_series(df["Resolvido"])
-
-# =========================================
-# Tipo normalizado (Request/Incident/Outro)
-# =========================================
-df["Tipo_Normalizado"] = df.apply(normalizar_tipo_linha, axis=1)
-
 # =========================================
 # Filtros (sidebar) – UM filtro único para tudo
 # =========================================
@@ -418,30 +627,13 @@ with st.sidebar:
 # =========================================
 ini, fim = period_bounds(modo_periodo, ano_sel, mes_sel, intervalo_sel)
 
-# Se "Todo período", restringe aos limites do dataset para o union
+# Se "Todo período", restringe aos limites do dataset para o union (calculados na carga)
 if modo_periodo == "Todo período":
-    min_criado = df["Criado"].dropna().dt.date.min() or date(1970, 1, 1)
-    max_criado = df["Criado"].dropna().dt.date.max() or date(2100, 12, 31)
-    if "Resolvido" in df.columns:
-        min_res = df["Resolvido"].dropna().dt.date.min() if df["Resolvido"].notna().any() else None
-        max_res = df["Resolvido"].dropna().dt.date.max() if df["Resolvido"].notna().any() else None
-    else:
-        min_res = None
-        max_res = None
-    min_all = min([d for d in [min_criado, min_res] if d is not None])
-    max_all = max([d for d in [max_criado, max_res] if d is not None])
-    ini, fim = min_all, max_all
-
-# Aplica UNION (Criado OU Resolvido no período)
-dfp = aplicar_periodo_union(df, ini, fim)
-
-# Filtro por analista
-if analista_sel != "Todos":
-    dfp = dfp[dfp["Responsavel"] == analista_sel]
+    ini, fim = df.attrs["limites_datas"]
 
-# Filtro por status (se selecionado)
-if status_sel:
-    dfp = dfp[dfp["Status"].astype(str).isin(status_sel)]
+# Aplica UNION (Criado OU Resolvido no período) + analista + status (se selecionado)
+mask = mascara_filtros(df, df.attrs["id_arquivo"], ini, fim, analista_sel, tuple(status_sel))
+dfp = df[mask]
 
 # =========================================
 # BLOCO 1 — Análise de Tickets por Analista (primeiro)
@@ -449,7 +641,9 @@ if status_sel:
 st.subheader("📊 Análise de Tickets por Analista")
 
 # Tabela de resumo por analista com regras do período
-resumo = resumo_por_analista_periodico(dfp, ini, fim, STATUS_ENCERRADOS)
+resumo = resumo_por_analista_periodico(
+    dfp, df.attrs["id_arquivo"], ini, fim, analista_sel, tuple(status_sel), STATUS_ENCERRADOS
+)
 st.dataframe(resumo, use_container_width=True)
 
 # (Removidos os demais gráficos opcionais)
@@ -468,12 +662,10 @@ perc_inc = (qtd_inc / total_tickets_union * 100) if total_tickets_union else 0
 perc_req = (qtd_req / total_tickets_union * 100) if total_tickets_union else 0
 
 # média de tempo de encerramento (somente tickets encerrados dentro do período)
-dfp_enc = dfp[
-    dfp["Resolvido"].notna()
-    & (dfp["Resolvido"].dt.date >= ini)
-    & (dfp["Resolvido"].dt.date <= fim)
-    & (dfp["Status"].isin(STATUS_ENCERRADOS))
-]
+if "Resolvido" in dfp.columns:
+    dfp_enc = dfp[mascara_periodo(dfp["Resolvido"], ini, fim) & mascara_status(dfp["Status"], STATUS_ENCERRADOS)]
+else:
+    dfp_enc = dfp.iloc[0:0]
 
 tmedio_dias = tempo_medio_encerramento_dias(dfp_enc)
 
@@ -491,26 +683,27 @@ with c4:
 # =========================================
 st.subheader("🏆 Top 10 Aplicações")
 if "Aplicacao" in dfp.columns and not dfp.empty:
+    aplicacao = dfp["Aplicacao"]
+    if isinstance(aplicacao.dtype, pd.CategoricalDtype) and "Não informado" not in aplicacao.cat.categories:
+        aplicacao = aplicacao.cat.add_categories("Não informado")
     apps = (
-        dfp.assign(Aplicacao=dfp["Aplicacao"].fillna("Não informado").astype(str))
-           .groupby("Aplicacao").size().reset_index(name="Quantidade")
+        aplicacao.fillna("Não informado").to_frame()
+           .groupby("Aplicacao", observed=True, sort=False).size().reset_index(name="Quantidade")
     )
     if apps.empty:
         st.info("Não há dados suficientes para gerar o Top 10 de Aplicações neste filtro.")
     else:
         top10 = apps.sort_values("Quantidade", ascending=False).head(10)
-        # Ordena as barras no gráfico horizontal conforme a ordem do DataFrame
+        # category_orders lista de cima para baixo: maior → menor, para leitura top-down
+        top10_order = top10["Aplicacao"].tolist()
         fig_apps = px.bar(
-            top10.sort_values("Quantidade"),  # menor → maior, para leitura top-down
+            top10,
             x="Quantidade",
             y="Aplicacao",
             orientation="h",
             text_auto=True,
-            title="Top 10 Aplicações por Volume (Union)"
-        )
-        fig_apps.update_layout(
-            yaxis={"categoryorder": "array",
-                   "categoryarray": top10.sort_values("Quantidade")["Aplicacao"].tolist()}
+            title="Top 10 Aplicações por Volume (Union)",
+            category_orders={"Aplicacao": top10_order}
         )
         st.plotly_chart(fig_apps, use_container_width=True)
 else:
@@ -526,13 +719,10 @@ cols_show = [c for c in [
 ] if c in dfp.columns]
 
 if cols_show:
-    # Ordena por "Criado" desc quando existir, senão por "Resolvido"
-    if "Criado" in cols_show:
-        df_show = dfp[cols_show].sort_values("Criado", ascending=False)
-    elif "Resolvido" in cols_show:
-        df_show = dfp[cols_show].sort_values("Resolvido", ascending=False)
-    else:
-        df_show = dfp[cols_show]
+    # Projeta primeiro; ordena por "Criado" desc quando existir, senão por "Resolvido"
+    view = dfp.loc[:, cols_show]
+    col_ordem = next((c for c in ["Criado", "Resolvido"] if c in cols_show), None)
+    df_show = view.iloc[ordem_desc(view[col_ordem])] if col_ordem else view
     st.dataframe(df_show, use_container_width=True)
 else:
     st.info("Não há colunas detalhadas disponíveis para exibir.")